@@ -0,0 +1,413 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from job_sources import SourceRunner
+
+HOUR = 3600
+
+
+def job_fingerprint(job):
+    """Short stable id for a posting, used to tell new postings from repeats"""
+    key = f"{job.title}|{job.company}|{job.location}".lower()
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+class QueryState:
+    """Crawl history and current interval for one (source, keyword, location) query"""
+
+    def __init__(self, source, keyword, location, interval, next_run=0.0, last_run=None,
+                 rate=0.0, runs=0, seen=()):
+        self.source = source
+        self.keyword = keyword
+        self.location = location
+        self.interval = interval
+        self.next_run = next_run
+        self.last_run = last_run
+        self.rate = rate  # Smoothed new postings per hour
+        self.runs = runs
+        self.seen = deque(seen)
+        self.seen_set = set(self.seen)
+
+    @property
+    def key(self):
+        return f"{self.source}|{self.keyword}|{self.location}"
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'keyword': self.keyword,
+            'location': self.location,
+            'interval': self.interval,
+            'next_run': self.next_run,
+            'last_run': self.last_run,
+            'rate': self.rate,
+            'runs': self.runs,
+            'seen': list(self.seen)
+        }
+
+
+class AdaptiveScheduler:
+    """Schedule scrape queries by how often they actually turn up new postings.
+
+    Each query's interval is set so that a run is expected to find about
+    target_new new postings, based on a smoothed per-hour rate of new
+    postings from earlier runs. Intervals stay within [min_interval,
+    max_interval] and all queries share a budget of requests per hour.
+    Queries that find nothing back off gradually towards max_interval.
+
+    on_jobs(jobs, pages) receives each tick's new postings and the digests
+    of the archived pages they were parsed from.
+
+    clock defaults to time.time and can be replaced with a simulated clock;
+    sources are JobSource instances (real or stub) keyed by name. Runs go
+    through SourceRunner, so each query is bounded by its source's timeout
+    and failures and overruns count against the source's circuit breaker.
+    """
+
+    def __init__(self, sources, queries, on_jobs=None, state_path=None, clock=time.time,
+                 min_interval=10 * 60, max_interval=6 * HOUR, initial_interval=30 * 60,
+                 requests_per_hour=60, target_new=10, backoff=1.5, smoothing=0.5,
+                 max_seen=2000, max_workers=4):
+        self.sources = sources
+        self.on_jobs = on_jobs
+        self.state_path = state_path
+        self.clock = clock
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.requests_per_hour = requests_per_hour
+        self.target_new = target_new
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.max_seen = max_seen
+        self.runner = SourceRunner(sources.values(), max_workers=max_workers)
+        # Guards queries and request_log, which status() reads from request threads
+        self._lock = threading.RLock()
+        self.request_log = deque()  # (timestamp, cost) of runs within the last hour
+        self.queries = {}
+
+        self.load_state()
+        for source, keyword, location in queries:
+            self.add_query(source, keyword, location)
+
+    def add_query(self, source, keyword, location=""):
+        """Start tracking a query; existing state from an earlier run is kept"""
+        # New queries first run one initial_interval from now, like the old fixed schedule
+        query = QueryState(source, keyword, location, self.initial_interval,
+                           next_run=self.clock() + self.initial_interval)
+        with self._lock:
+            if query.key not in self.queries:
+                self.queries[query.key] = query
+            return self.queries[query.key]
+
+    def request_cost(self, query):
+        """Number of requests one run of a query makes"""
+        return getattr(self.sources[query.source], 'max_pages', 1)
+
+    def budget_remaining(self):
+        now = self.clock()
+        with self._lock:
+            while self.request_log and self.request_log[0][0] <= now - HOUR:
+                self.request_log.popleft()
+            return self.requests_per_hour - sum(cost for _, cost in self.request_log)
+
+    def due_queries(self):
+        """Queries whose next run has passed, most productive and most overdue first"""
+        now = self.clock()
+        with self._lock:
+            due = [
+                query for query in self.queries.values()
+                if query.next_run <= now and query.source in self.sources
+                and self.sources[query.source].enabled
+            ]
+        due.sort(key=lambda query: (-query.rate, query.next_run))
+        return due
+
+    def run_pending(self):
+        """Run the due queries that fit in the request budget and return how many new jobs were found"""
+        selected = []
+        budget = self.budget_remaining()
+        for query in self.due_queries():
+            source = self.sources[query.source]
+            if not source.breaker.allow():
+                continue
+            cost = self.request_cost(query)
+            if cost > budget:
+                # Over budget: leave the query due so it runs once budget frees up
+                continue
+            budget -= cost
+            selected.append(query)
+        return self._run(selected)
+
+    def run_now(self, keyword):
+        """Run every enabled query for a keyword right away, outside the schedule and budget.
+
+        Use this instead of scraping the sources directly, so the postings it
+        stores count as seen and later scheduled runs don't store them again.
+        Returns how many new jobs were found.
+        """
+        with self._lock:
+            selected = [
+                query for query in self.queries.values()
+                if query.keyword == keyword and query.source in self.sources
+                and self.sources[query.source].enabled
+            ]
+        return self._run([query for query in selected if self.sources[query.source].breaker.allow()])
+
+    def _run(self, selected):
+        if not selected:
+            return 0
+
+        now = self.clock()
+        with self._lock:
+            for query in selected:
+                self.request_log.append((now, self.request_cost(query)))
+
+        runs = {(self.sources[query.source], query.keyword, query.location): query for query in selected}
+        new_jobs = []
+        pages = []
+        # Jobs is None for a query that failed or was still blocked at its source's timeout
+        for run, jobs, digests in self.runner.execute(runs):
+            with self._lock:
+                new_jobs.extend(self.record_run(runs[run], jobs))
+            pages.extend(digests)
+        # Pages whose postings were all repeats are still handed on, so they can be marked processed
+        if (new_jobs or pages) and self.on_jobs:
+            self.on_jobs(new_jobs, pages)
+
+        self.save_state()
+        return len(new_jobs)
+
+    def record_run(self, query, jobs):
+        """Update a query's yield history and interval; return the new postings"""
+        now = self.clock()
+        new_jobs = []
+        for job in jobs or ():
+            fingerprint = job_fingerprint(job)
+            if fingerprint in query.seen_set:
+                continue
+            query.seen_set.add(fingerprint)
+            query.seen.append(fingerprint)
+            new_jobs.append(job)
+        while len(query.seen) > self.max_seen:
+            query.seen_set.discard(query.seen.popleft())
+
+        # The first run only establishes what is already posted, so it says nothing about velocity
+        if jobs is not None and query.last_run is not None:
+            # Manual runs can come seconds apart; don't read a handful of postings as a huge rate
+            hours = max(now - query.last_run, self.min_interval) / HOUR
+            observed = len(new_jobs) / hours
+            query.rate = self.smoothing * observed + (1 - self.smoothing) * query.rate
+            query.interval = self.next_interval(query)
+
+        if jobs is not None:
+            query.last_run = now
+            query.runs += 1
+        query.next_run = now + query.interval
+        return new_jobs
+
+    def next_interval(self, query):
+        if query.rate > 0:
+            interval = self.target_new / query.rate * HOUR
+        else:
+            interval = query.interval * self.backoff
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def status(self):
+        """Report the schedule for every query"""
+        now = self.clock()
+        with self._lock:
+            return self._status(now)
+
+    def _status(self, now):
+        return {
+            'budget_remaining': self.budget_remaining(),
+            'requests_per_hour': self.requests_per_hour,
+            'queries': [
+                {
+                    'source': query.source,
+                    'keyword': query.keyword,
+                    'location': query.location,
+                    'interval_minutes': round(query.interval / 60, 1),
+                    'new_per_hour': round(query.rate, 2),
+                    'runs': query.runs,
+                    'due_in_seconds': round(max(0.0, query.next_run - now))
+                }
+                for query in sorted(self.queries.values(), key=lambda query: query.next_run)
+            ]
+        }
+
+    def load_state(self):
+        """Restore query history and the request log saved by an earlier run"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            queries = [QueryState(**data) for data in state.get('queries', [])]
+            request_log = deque((float(timestamp), int(cost)) for timestamp, cost in state.get('request_log', []))
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            # A missing, corrupt or outdated state file means starting with a fresh schedule
+            print(f"Could not load scheduler state: {e}")
+            return
+
+        with self._lock:
+            self.queries.update((query.key, query) for query in queries)
+            self.request_log = request_log
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        with self._lock:
+            state = {
+                'queries': [query.to_dict() for query in self.queries.values()],
+                'request_log': list(self.request_log)
+            }
+        # Write to a temporary file first so a crash never leaves a half-written state
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+
+# Example usage: simulate a day of scheduling with a stub source and clock.
+# Run with --check to verify interval, backoff, budget, breaker, timeout and
+# persistence behaviour deterministically instead.
+if __name__ == "__main__":
+    import random
+    import sys
+    import tempfile
+    from job_sources import JobSource, SourceError, make_job
+
+    class SimulatedClock:
+        def __init__(self):
+            self.now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    class StubSource(JobSource):
+        """Posts new jobs at a fixed rate per keyword; can fail or take simulated time per run"""
+
+        def __init__(self, clock, postings_per_hour, name='stub', fail=False, run_seconds=0, **kwargs):
+            super().__init__(min_interval=0.0, clock=clock, **kwargs)
+            self.name = name
+            self.postings_per_hour = postings_per_hour
+            self.fail = fail
+            self.run_seconds = run_seconds
+
+        def fetch(self, keyword, location):
+            if self.fail:
+                raise SourceError("stub failure")
+            self.clock.now += self.run_seconds
+            yield keyword, location, int(self.clock() / HOUR * self.postings_per_hour.get(keyword, 0))
+
+        def parse(self, payload):
+            keyword, location, posted = payload
+            for i in range(posted):
+                yield f"{keyword} #{i}", location or "Remote"
+
+        def normalize(self, item):
+            title, location = item
+            return make_job(title, "Stub Co", location, "", "2024-01-01", self.name)
+
+    def simulate():
+        clock = SimulatedClock()
+        stub = StubSource(clock, {'python': 20, 'rust': 1, 'cobol': 0})
+        scheduler = AdaptiveScheduler(
+            {'stub': stub},
+            [('stub', keyword, '') for keyword in ('python', 'rust', 'cobol')],
+            clock=clock,
+            requests_per_hour=10
+        )
+
+        while clock.now < 24 * HOUR:
+            scheduler.run_pending()
+            clock.now += random.randint(1, 5) * 60
+
+        for query in scheduler.status()['queries']:
+            print(f"{query['keyword']:<8} runs={query['runs']:<4} "
+                  f"interval={query['interval_minutes']}min new/hour={query['new_per_hour']}")
+
+    def check():
+        # Intervals: a busy query settles near target_new / rate, a dead one backs off to max_interval
+        clock = SimulatedClock()
+        scheduler = AdaptiveScheduler(
+            {'stub': StubSource(clock, {'python': 20, 'cobol': 0})},
+            [('stub', 'python', ''), ('stub', 'cobol', '')],
+            clock=clock, requests_per_hour=100
+        )
+        while clock.now < 2 * 24 * HOUR:
+            scheduler.run_pending()
+            clock.now += 60
+        python, cobol = scheduler.queries['stub|python|'], scheduler.queries['stub|cobol|']
+        assert 15 <= python.rate <= 25, python.rate
+        assert 20 * 60 <= python.interval <= 40 * 60, python.interval
+        assert cobol.rate == 0 and cobol.interval == scheduler.max_interval, cobol.interval
+
+        # Backoff: each empty run multiplies the interval by backoff
+        clock = SimulatedClock()
+        scheduler = AdaptiveScheduler({'stub': StubSource(clock, {})}, [('stub', 'cobol', '')], clock=clock)
+        intervals = []
+        for _ in range(4):
+            clock.now = scheduler.queries['stub|cobol|'].next_run
+            scheduler.run_pending()
+            intervals.append(scheduler.queries['stub|cobol|'].interval)
+        assert intervals == [1800, 2700, 4050, 6075], intervals
+
+        # Budget: only requests_per_hour runs start per hour, the rest wait until budget frees up
+        clock = SimulatedClock()
+        scheduler = AdaptiveScheduler(
+            {'stub': StubSource(clock, {})},
+            [('stub', keyword, '') for keyword in ('a', 'b', 'c')],
+            clock=clock, requests_per_hour=2
+        )
+        clock.now = scheduler.initial_interval
+        scheduler.run_pending()
+        assert sorted(query.runs for query in scheduler.queries.values()) == [0, 1, 1]
+        assert scheduler.budget_remaining() == 0
+        clock.now += HOUR
+        scheduler.run_pending()
+        assert scheduler.queries['stub|c|'].runs == 1
+
+        # Breaker: repeated failures open it and the cool-down runs on the simulated clock
+        clock = SimulatedClock()
+        flaky = StubSource(clock, {}, name='flaky', fail=True)
+        scheduler = AdaptiveScheduler({'flaky': flaky}, [('flaky', 'python', '')], clock=clock)
+        for _ in range(flaky.breaker.failure_threshold):
+            clock.now = scheduler.queries['flaky|python|'].next_run
+            scheduler.run_pending()
+        assert flaky.breaker.state == flaky.breaker.OPEN
+        clock.now += flaky.breaker.reset_timeout
+        assert flaky.breaker.state == flaky.breaker.HALF_OPEN
+
+        # Timeout: a run past its source's timeout keeps its jobs but counts as a failure
+        clock = SimulatedClock()
+        clock.now = HOUR
+        slow = StubSource(clock, {'python': 20}, name='slow', run_seconds=120, timeout=60)
+        scheduler = AdaptiveScheduler({'slow': slow}, [('slow', 'python', '')], clock=clock)
+        assert scheduler.run_now('python') == 20
+        assert slow.breaker.failures == 1
+
+        # Persistence: a restarted scheduler picks up the saved history
+        with tempfile.TemporaryDirectory() as tmp:
+            state_path = f"{tmp}/state.json"
+            clock = SimulatedClock()
+            stub = StubSource(clock, {'python': 20})
+            scheduler = AdaptiveScheduler({'stub': stub}, [('stub', 'python', '')], clock=clock,
+                                          state_path=state_path)
+            for _ in range(3):
+                clock.now = scheduler.queries['stub|python|'].next_run
+                scheduler.run_pending()
+            restored = AdaptiveScheduler({'stub': stub}, [('stub', 'python', '')], clock=clock,
+                                         state_path=state_path)
+            assert restored.queries['stub|python|'].to_dict() == scheduler.queries['stub|python|'].to_dict()
+            assert restored.budget_remaining() == scheduler.budget_remaining()
+
+        print("All scheduler checks passed")
+
+    check() if '--check' in sys.argv[1:] else simulate()
@@ -13,7 +13,13 @@ from flask import Flask, render_template, jsonify, request
 import plotly.graph_objs as go
 import plotly.utils
 from urllib.parse import quote_plus
-import schedule
+from adaptive_scheduler import AdaptiveScheduler
+from dashboard_cache import KeywordDashboardCache
+from job_analyzer import JobAnalyzer
+from job_database import JobDatabase
+from job_sources import IndeedSource, MockSource, ApiSource, SourceRunner, SourceError, extract_skills
+from locations import REGION_CODES
+from page_archive import PageArchive
 
 app = Flask(__name__)
 
@@ -26,290 +32,73 @@ class JobScraper:
         self.session.headers.update(self.headers)
         
     def scrape_indeed(self, keyword="software developer", location="", max_pages=3):
-        """Scrape job listings from Indeed"""
-        jobs = []
-        base_url = "https://www.indeed.com/jobs"
-        
-        for page in range(max_pages):
-            params = {
-                'q': keyword,
-                'l': location,
-                'start': page * 10
-            }
-            
-            try:
-                response = self.session.get(base_url, params=params, timeout=10)
-                if response.status_code != 200:
-                    print(f"Failed to fetch page {page + 1}")
-                    continue
-                    
-                soup = BeautifulSoup(response.content, 'html.parser')
-                job_cards = soup.find_all('div', class_='job_seen_beacon')
-                
-                for card in job_cards:
-                    try:
-                        title_elem = card.find('h2', class_='jobTitle')
-                        title = title_elem.get_text(strip=True) if title_elem else "N/A"
-                        
-                        company_elem = card.find('span', class_='companyName')
-                        company = company_elem.get_text(strip=True) if company_elem else "N/A"
-                        
-                        location_elem = card.find('div', class_='companyLocation')
-                        job_location = location_elem.get_text(strip=True) if location_elem else "N/A"
-                        
-                        summary_elem = card.find('div', class_='summary')
-                        summary = summary_elem.get_text(strip=True) if summary_elem else ""
-                        
-                        # Extract skills from job description
-                        skills = self.extract_skills(title + " " + summary)
-                        
-                        job = {
-                            'title': title,
-                            'company': company,
-                            'location': job_location,
-                            'skills': ', '.join(skills),
-                            'date_posted': datetime.now().strftime('%Y-%m-%d'),
-                            'source': 'Indeed'
-                        }
-                        jobs.append(job)
-                        
-                    except Exception as e:
-                        print(f"Error parsing job card: {e}")
-                        continue
-                
-                # Be polite - add delay between requests
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                print(f"Error scraping page {page + 1}: {e}")
-                continue
-                
-        return jobs
+        """Stream job listings scraped from Indeed"""
+        source = IndeedSource(self.session, max_pages=max_pages)
+        try:
+            yield from source.iter_jobs(keyword, location)
+        except SourceError as e:
+            # Callers expect an empty result rather than an error when Indeed is unreachable
+            print(f"Error scraping Indeed: {e}")
     
     def generate_mock_jobs(self, count=50):
-        """Generate mock job data for demonstration"""
-        job_titles = [
-            "Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer",
-            "Frontend Developer", "Backend Developer", "Full Stack Developer", "Data Analyst",
-            "Machine Learning Engineer", "Cloud Architect", "Cybersecurity Analyst",
-            "Mobile Developer", "QA Engineer", "UX Designer", "Technical Writer"
-        ]
-        
-        companies = [
-            "Google", "Microsoft", "Amazon", "Apple", "Meta", "Netflix", "Spotify",
-            "Uber", "Airbnb", "Tesla", "Stripe", "Shopify", "Zoom", "Slack", "Adobe"
-        ]
-        
-        cities = [
-            "San Francisco, CA", "New York, NY", "Seattle, WA", "Austin, TX",
-            "Boston, MA", "Los Angeles, CA", "Chicago, IL", "Denver, CO",
-            "Atlanta, GA", "Miami, FL", "Portland, OR", "San Diego, CA"
-        ]
-        
-        skills_pool = [
-            "Python", "JavaScript", "React", "Node.js", "AWS", "Docker", "Kubernetes",
-            "SQL", "MongoDB", "PostgreSQL", "Git", "Linux", "Java", "C++", "Go",
-            "TypeScript", "Vue.js", "Angular", "Django", "Flask", "TensorFlow",
-            "PyTorch", "Pandas", "NumPy", "Scikit-learn", "Tableau", "Power BI"
-        ]
-        
-        jobs = []
-        for i in range(count):
-            # Random date within last 30 days
-            days_ago = random.randint(0, 30)
-            date_posted = (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
-            
-            # Random skills (2-6 skills per job)
-            num_skills = random.randint(2, 6)
-            job_skills = random.sample(skills_pool, num_skills)
-            
-            job = {
-                'title': random.choice(job_titles),
-                'company': random.choice(companies),
-                'location': random.choice(cities),
-                'skills': ', '.join(job_skills),
-                'date_posted': date_posted,
-                'source': 'Mock Data'
-            }
-            jobs.append(job)
-            
-        return jobs
+        """Stream mock job data for demonstration"""
+        return MockSource(count).iter_jobs()
     
     def extract_skills(self, text):
         """Extract technical skills from job description"""
-        skills_keywords = [
-            'python', 'javascript', 'java', 'react', 'node.js', 'aws', 'docker',
-            'kubernetes', 'sql', 'mongodb', 'postgresql', 'git', 'linux',
-            'typescript', 'vue.js', 'angular', 'django', 'flask', 'tensorflow',
-            'pytorch', 'pandas', 'numpy', 'scikit-learn', 'tableau', 'power bi',
-            'c++', 'go', 'rust', 'scala', 'r', 'matlab', 'spark', 'hadoop',
-            'elasticsearch', 'redis', 'nginx', 'apache', 'jenkins', 'gitlab'
-        ]
-        
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in skills_keywords:
-            if skill in text_lower:
-                found_skills.append(skill.title())
-                
-        return found_skills
-
-class JobDatabase:
-    def __init__(self, db_path='jobs.db'):
-        self.db_path = db_path
-        self.init_database()
-    
-    def init_database(self):
-        """Initialize the SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                company TEXT NOT NULL,
-                location TEXT NOT NULL,
-                skills TEXT,
-                date_posted DATE NOT NULL,
-                source TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
-    def insert_jobs(self, jobs):
-        """Insert job listings into database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for job in jobs:
-            cursor.execute('''
-                INSERT INTO jobs (title, company, location, skills, date_posted, source)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (job['title'], job['company'], job['location'], 
-                  job['skills'], job['date_posted'], job['source']))
-        
-        conn.commit()
-        conn.close()
-        print(f"Inserted {len(jobs)} jobs into database")
-    
-    def get_all_jobs(self):
-        """Retrieve all jobs from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM jobs ORDER BY created_at DESC')
-        jobs = cursor.fetchall()
-        
-        conn.close()
-        return jobs
-    
-    def get_jobs_by_keyword(self, keyword):
-        """Get jobs filtered by keyword"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM jobs 
-            WHERE title LIKE ? OR skills LIKE ?
-            ORDER BY created_at DESC
-        ''', (f'%{keyword}%', f'%{keyword}%'))
-        
-        jobs = cursor.fetchall()
-        conn.close()
-        return jobs
-    
-    def clear_old_data(self):
-        """Clear old job data (older than 30 days)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        cursor.execute('DELETE FROM jobs WHERE date_posted < ?', (thirty_days_ago,))
-        
-        conn.commit()
-        conn.close()
-
-class JobAnalyzer:
-    def __init__(self, db):
-        self.db = db
-    
-    def get_top_job_titles(self, limit=5, keyword=None):
-        """Get top job titles"""
-        if keyword:
-            jobs = self.db.get_jobs_by_keyword(keyword)
-        else:
-            jobs = self.db.get_all_jobs()
-        
-        titles = [job[1] for job in jobs]  # job[1] is title
-        title_counts = Counter(titles)
-        return title_counts.most_common(limit)
-    
-    def get_top_skills(self, limit=10, keyword=None):
-        """Get most frequent skills"""
-        if keyword:
-            jobs = self.db.get_jobs_by_keyword(keyword)
-        else:
-            jobs = self.db.get_all_jobs()
-        
-        all_skills = []
-        for job in jobs:
-            skills = job[4]  # job[4] is skills
-            if skills:
-                skill_list = [skill.strip() for skill in skills.split(',')]
-                all_skills.extend(skill_list)
-        
-        skill_counts = Counter(all_skills)
-        return skill_counts.most_common(limit)
-    
-    def get_top_cities(self, limit=5, keyword=None):
-        """Get cities with most job openings"""
-        if keyword:
-            jobs = self.db.get_jobs_by_keyword(keyword)
-        else:
-            jobs = self.db.get_all_jobs()
-        
-        locations = [job[3] for job in jobs]  # job[3] is location
-        location_counts = Counter(locations)
-        return location_counts.most_common(limit)
-    
-    def get_posting_trends(self, keyword=None):
-        """Get job posting trends over time"""
-        if keyword:
-            jobs = self.db.get_jobs_by_keyword(keyword)
-        else:
-            jobs = self.db.get_all_jobs()
-        
-        dates = [job[5] for job in jobs]  # job[5] is date_posted
-        date_counts = Counter(dates)
-        
-        # Sort by date
-        sorted_dates = sorted(date_counts.items())
-        return sorted_dates
+        return extract_skills(text)
 
 # Initialize components
 scraper = JobScraper()
 db = JobDatabase()
 analyzer = JobAnalyzer(db)
 
+# Keyword dashboards for the most popular searches are precomputed after each ingest
+dashboard_cache = KeywordDashboardCache(analyzer, top_k=25, seed_keywords=['python', 'data', 'react'])
+
+# Fetched pages are archived so parsers can be re-run offline (see page_archive.py)
+page_archive = PageArchive('page_archive')
+
+# Job sources run in parallel on each scrape cycle.
+# Enable Indeed for real scraping (be careful with rate limits)
+source_runner = SourceRunner([
+    MockSource(count=50),
+    IndeedSource(scraper.session, max_pages=2, enabled=False, timeout=120, archive=page_archive),
+    ApiSource(enabled=False, timeout=30, archive=page_archive),
+])
+
+def store_jobs(jobs, pages=()):
+    """Store scraped jobs and refresh precomputed dashboards in the background"""
+    count = db.insert_jobs(jobs)
+    # Only mark archived pages processed once their jobs are committed, so replay can backfill the rest
+    if pages:
+        page_archive.mark_processed(pages)
+    if count:
+        dashboard_cache.mark_ingest()
+        dashboard_cache.refresh_in_background()
+    return count
+
+# Queries crawled by the background scheduler, one per keyword and source (disabled sources are skipped)
+SCHEDULED_KEYWORDS = ["software engineer", "data scientist", "python developer"]
+
+adaptive_scheduler = AdaptiveScheduler(
+    {source.name: source for source in source_runner.sources},
+    [(source.name, keyword, "") for source in source_runner.sources for keyword in SCHEDULED_KEYWORDS],
+    on_jobs=store_jobs,
+    state_path='scheduler_state.json',
+    requests_per_hour=60
+)
+
 def scrape_and_store_jobs():
     """Function to scrape and store jobs"""
     print("Starting job scraping...")
     
-    # For demonstration, we'll use mock data
-    # In production, you would use real scraping
-    jobs = scraper.generate_mock_jobs(50)
-    
-    # Uncomment below for real Indeed scraping (be careful with rate limits)
-    # jobs.extend(scraper.scrape_indeed("software engineer", "", 2))
+    # For demonstration only the mock source is enabled by default.
+    # Run through the scheduler so its next runs of this query skip the postings stored here.
+    count = adaptive_scheduler.run_now("software engineer")
     
-    if jobs:
-        db.insert_jobs(jobs)
-        print(f"Successfully scraped and stored {len(jobs)} jobs")
+    if count:
+        print(f"Successfully scraped and stored {count} jobs")
     else:
         print("No jobs found")
 
@@ -320,19 +109,22 @@ def index():
 
 @app.route('/api/dashboard')
 def dashboard_data():
-    keyword = request.args.get('keyword', '')
+    keyword = request.args.get('keyword', '').strip()
     
-    top_titles = analyzer.get_top_job_titles(5, keyword if keyword else None)
-    top_skills = analyzer.get_top_skills(10, keyword if keyword else None)
-    top_cities = analyzer.get_top_cities(5, keyword if keyword else None)
-    trends = analyzer.get_posting_trends(keyword if keyword else None)
+    if not keyword:
+        return jsonify(analyzer.get_dashboard())
     
-    return jsonify({
-        'top_titles': top_titles,
-        'top_skills': top_skills,
-        'top_cities': top_cities,
-        'trends': trends
-    })
+    # Popular keywords are served from precomputed results, the long tail runs live
+    data = dashboard_cache.get(keyword)
+    if data is None:
+        data = analyzer.get_dashboard(keyword)
+    
+    return jsonify(data)
+
+@app.route('/api/dashboard/cache')
+def dashboard_cache_stats():
+    """Get hit ratio and freshness of precomputed keyword dashboards"""
+    return jsonify(dashboard_cache.stats())
 
 @app.route('/api/scrape')
 def trigger_scrape():
@@ -343,28 +135,62 @@ def trigger_scrape():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
+@app.route('/api/sources')
+def get_sources():
+    """Get the status of each job source"""
+    return jsonify(source_runner.status())
+
+@app.route('/api/cities')
+def get_cities():
+    """Get top cities, optionally filtered by keyword, region, work mode or radius around a city"""
+    try:
+        limit = int(request.args.get('limit', 10))
+        radius_km = float(request.args.get('radius_km', 50))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit and radius_km must be numbers'}), 400
+    
+    # Regions may be given as a code ("CA") or a name ("California")
+    region = request.args.get('region', '').strip()
+    region = REGION_CODES.get(region.lower(), region.upper()) if region else None
+    
+    return jsonify(analyzer.get_top_cities(
+        limit,
+        keyword=request.args.get('keyword') or None,
+        region=region,
+        near=request.args.get('near') or None,
+        radius_km=radius_km,
+        work_mode=request.args.get('work_mode') or None
+    ))
+
+@app.route('/api/schedule')
+def get_schedule():
+    """Get the adaptive crawl schedule"""
+    return jsonify(adaptive_scheduler.status())
+
 @app.route('/api/stats')
 def get_stats():
     """Get basic statistics"""
-    jobs = db.get_all_jobs()
-    total_jobs = len(jobs)
+    total_jobs = 0
     
-    # Get unique companies and locations
-    companies = set(job[2] for job in jobs)
-    locations = set(job[3] for job in jobs)
+    # Get unique companies
+    companies = set()
+    for job in db.iter_jobs():
+        total_jobs += 1
+        companies.add(job.company)
     
     return jsonify({
         'total_jobs': total_jobs,
         'total_companies': len(companies),
-        'total_locations': len(locations)
+        'total_locations': db.count_locations()
     })
 
-# Scheduled scraping (runs every 30 minutes)
+# Scheduled scraping (each query's interval adapts to how often it finds new jobs)
 def schedule_scraping():
-    schedule.every(30).minutes.do(scrape_and_store_jobs)
-    
     while True:
-        schedule.run_pending()
+        try:
+            adaptive_scheduler.run_pending()
+        except Exception as e:
+            print(f"Scheduled scraping failed: {e}")
         time.sleep(60)
 
 if __name__ == '__main__':
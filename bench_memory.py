@@ -0,0 +1,112 @@
+"""
+Memory benchmark for the dashboard analysis.
+
+Compares peak RSS for running the four dashboard analyses over a large jobs
+table the old way (fetchall() into lists of tuples) against the streaming
+JobDatabase.iter_jobs() / JobAnalyzer path. Each mode runs in its own
+process so peak RSS is measured independently.
+
+Usage:
+    python bench_memory.py [rows]
+"""
+
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+DEFAULT_ROWS = 1_000_000
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def build_database(db_path, rows):
+    """Fill a jobs database with mock rows"""
+    from job_database import JobDatabase
+    from job_sources import MockSource
+
+    JobDatabase(db_path).insert_jobs(MockSource(rows).iter_jobs())
+
+
+def run_before(db_path):
+    """Dashboard analyses as they were written before streaming records"""
+    def get_all_jobs():
+        conn = sqlite3.connect(db_path)
+        # The jobs table as it was then, before the normalized location and page columns
+        jobs = conn.execute('''
+            SELECT id, title, company, location, skills, date_posted, source, created_at
+            FROM jobs ORDER BY created_at DESC
+        ''').fetchall()
+        conn.close()
+        return jobs
+
+    jobs = get_all_jobs()
+    Counter([job[1] for job in jobs]).most_common(5)
+
+    jobs = get_all_jobs()
+    all_skills = []
+    for job in jobs:
+        if job[4]:
+            all_skills.extend(skill.strip() for skill in job[4].split(','))
+    Counter(all_skills).most_common(10)
+
+    jobs = get_all_jobs()
+    Counter([job[3] for job in jobs]).most_common(5)
+
+    jobs = get_all_jobs()
+    sorted(Counter([job[5] for job in jobs]).items())
+
+
+def run_after(db_path):
+    """Dashboard analyses through the streaming JobAnalyzer"""
+    from job_analyzer import JobAnalyzer
+    from job_database import JobDatabase
+
+    analyzer = JobAnalyzer(JobDatabase(db_path))
+    analyzer.get_top_job_titles(5)
+    analyzer.get_top_skills(10)
+    analyzer.get_top_cities(5)
+    analyzer.get_posting_trends()
+
+
+def measure(mode, db_path):
+    """Run one mode in a fresh interpreter and return (seconds, peak MB)"""
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--mode', mode, db_path],
+        text=True
+    )
+    seconds, peak = output.strip().splitlines()[-1].split()
+    return float(seconds), float(peak)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--mode':
+        mode, db_path = sys.argv[2], sys.argv[3]
+        start = time.perf_counter()
+        run_before(db_path) if mode == 'before' else run_after(db_path)
+        print(f"{time.perf_counter() - start:.2f} {peak_rss_mb():.1f}")
+        return
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench_jobs.db')
+        print(f"Building database with {rows:,} jobs...")
+        build_database(db_path, rows)
+
+        print(f"{'mode':<8}{'time (s)':>10}{'peak RSS (MB)':>16}")
+        for mode in ('before', 'after'):
+            seconds, peak = measure(mode, db_path)
+            print(f"{mode:<8}{seconds:>10.2f}{peak:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import Counter
+
+
+class KeywordDashboardCache:
+    """Precomputed dashboard results for the most searched keywords.
+
+    Every keyword request is counted. After each ingest refresh() rebuilds the
+    dashboard bundle for the top_k keywords, and get() serves those bundles
+    directly. Keywords outside the top_k return None so the caller can fall
+    back to the live query. Until a refresh finishes, get() keeps serving the
+    previous bundles.
+    """
+
+    def __init__(self, analyzer, top_k=25, seed_keywords=(), max_tracked=10000):
+        self.analyzer = analyzer
+        self.top_k = top_k
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        # Seeded keywords rank below any keyword that has actually been searched
+        self.query_counts = Counter({self.normalize(keyword): 0 for keyword in seed_keywords})
+        self.bundles = {}
+        self.hits = 0
+        self.misses = 0
+        self.last_refresh = None
+        self.last_ingest = None
+        self._refreshing = False
+        self._refresh_pending = False
+
+    @staticmethod
+    def normalize(keyword):
+        # SQLite LIKE is case-insensitive, so keywords differing only in case share a bundle
+        return keyword.strip().lower()
+
+    def get(self, keyword):
+        """Record a query and return its precomputed bundle, or None on a miss"""
+        keyword = self.normalize(keyword)
+        with self._lock:
+            self.query_counts[keyword] += 1
+            if len(self.query_counts) > self.max_tracked:
+                # Forget the long tail so one-off searches can't grow the counter forever
+                self.query_counts = Counter(dict(self.query_counts.most_common(self.max_tracked // 2)))
+            entry = self.bundles.get(keyword)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry['data']
+
+    def mark_ingest(self):
+        """Note that new jobs were stored and the bundles are now out of date"""
+        with self._lock:
+            self.last_ingest = time.time()
+
+    def refresh(self):
+        """Recompute bundles for the current top_k keywords"""
+        with self._lock:
+            keywords = [keyword for keyword, _ in self.query_counts.most_common(self.top_k)]
+
+        bundles = {}
+        for keyword in keywords:
+            bundles[keyword] = {
+                'data': self.analyzer.get_dashboard(keyword),
+                'computed_at': time.time()
+            }
+
+        with self._lock:
+            self.bundles = bundles
+            self.last_refresh = time.time()
+
+        print(f"Precomputed dashboard results for {len(bundles)} keywords")
+
+    def refresh_in_background(self):
+        """Run refresh() on a background thread so ingest doesn't wait for every bundle"""
+        with self._lock:
+            if self._refreshing:
+                # Ingests during a running refresh are covered by one more refresh after it
+                self._refresh_pending = True
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_until_current, daemon=True).start()
+
+    def _refresh_until_current(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Dashboard refresh failed: {e}")
+            with self._lock:
+                if not self._refresh_pending:
+                    self._refreshing = False
+                    return
+                self._refresh_pending = False
+
+    def stats(self):
+        """Report hit ratio, freshness and the keywords currently precomputed"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            now = time.time()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'last_refresh': self.last_refresh,
+                'last_ingest': self.last_ingest,
+                # Bundles are stale if jobs were ingested after they were computed
+                'stale': bool(self.last_ingest and (self.last_refresh or 0) < self.last_ingest),
+                'precomputed': [
+                    {
+                        'keyword': keyword,
+                        'queries': self.query_counts[keyword],
+                        'age_seconds': round(now - entry['computed_at'], 1)
+                    }
+                    for keyword, entry in self.bundles.items()
+                ],
+                'top_queries': self.query_counts.most_common(self.top_k)
+            }
@@ -0,0 +1,63 @@
+from collections import Counter
+
+class JobAnalyzer:
+    def __init__(self, db):
+        self.db = db
+    
+    def iter_jobs(self, keyword=None):
+        """Stream the jobs an analysis runs over"""
+        return self.db.iter_jobs(keyword)
+    
+    def iter_skills(self, jobs):
+        """Yield each skill mentioned by a stream of jobs"""
+        for job in jobs:
+            if job.skills:
+                for skill in job.skills.split(','):
+                    yield skill.strip()
+    
+    def get_top_job_titles(self, limit=5, keyword=None):
+        """Get top job titles"""
+        title_counts = Counter(job.title for job in self.iter_jobs(keyword))
+        return title_counts.most_common(limit)
+    
+    def get_top_skills(self, limit=10, keyword=None):
+        """Get most frequent skills"""
+        skill_counts = Counter(self.iter_skills(self.iter_jobs(keyword)))
+        return skill_counts.most_common(limit)
+    
+    def get_top_cities(self, limit=5, keyword=None, region=None, near=None, radius_km=50, work_mode=None):
+        """Get cities with most job openings, optionally within a region or radius of a city"""
+        city_ids = None
+        if near:
+            city = self.db.find_city(near)
+            if city is None or city.latitude is None:
+                return []
+            city_ids = self.db.get_city_ids_within(city.latitude, city.longitude, radius_km)
+        return self.db.get_top_cities(limit, keyword, region, city_ids, work_mode)
+    
+    def get_posting_trends(self, keyword=None):
+        """Get job posting trends over time"""
+        date_counts = Counter(job.date_posted for job in self.iter_jobs(keyword))
+        
+        # Sort by date
+        sorted_dates = sorted(date_counts.items())
+        return sorted_dates
+    
+    def get_dashboard(self, keyword=None):
+        """Get all dashboard aggregates: titles, skills and trends from one scan, cities from one grouped query"""
+        title_counts = Counter()
+        skill_counts = Counter()
+        date_counts = Counter()
+        
+        for job in self.iter_jobs(keyword):
+            title_counts[job.title] += 1
+            date_counts[job.date_posted] += 1
+            skill_counts.update(self.iter_skills((job,)))
+        
+        return {
+            'top_titles': title_counts.most_common(5),
+            'top_skills': skill_counts.most_common(10),
+            # Cities come from the indexed location dimension rather than the scan
+            'top_cities': self.get_top_cities(5, keyword),
+            'trends': sorted(date_counts.items())
+        }
@@ -0,0 +1,268 @@
+import sqlite3
+from datetime import datetime, timedelta
+from job_sources import job_from_row
+from locations import City, CITY_NAME_INDEX, GAZETTEER_RECORDS, parse_location, slugify, bounding_box, haversine_km
+
+class JobDatabase:
+    def __init__(self, db_path='jobs.db'):
+        self.db_path = db_path
+        self.init_database()
+    
+    def init_database(self):
+        """Initialize the SQLite database"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                company TEXT NOT NULL,
+                location TEXT NOT NULL,
+                skills TEXT,
+                date_posted DATE NOT NULL,
+                source TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Canonical cities, keyed by the city_id stored on each job
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS locations (
+                city_id TEXT PRIMARY KEY,
+                city TEXT NOT NULL,
+                region TEXT,
+                country TEXT NOT NULL,
+                latitude REAL,
+                longitude REAL
+            )
+        ''')
+        cursor.executemany('''
+            INSERT OR IGNORE INTO locations (city_id, city, region, country, latitude, longitude)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', GAZETTEER_RECORDS)
+        
+        # Normalized location columns, added to databases created before they existed
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(jobs)')}
+        for column in ('city_id', 'region', 'work_mode', 'page_digest'):
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE jobs ADD COLUMN {column} TEXT')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_city_id ON jobs (city_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_page_digest ON jobs (page_digest)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_posting ON jobs (title, company, location)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_region ON jobs (region)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_locations_geo ON locations (latitude, longitude)')
+        
+        self.backfill_locations(cursor)
+        
+        conn.commit()
+        conn.close()
+    
+    def backfill_locations(self, cursor):
+        """Normalize locations of jobs stored before normalization happened at ingest"""
+        # Jobs always get a work_mode once normalized, even when no city is known
+        cursor.execute('''
+            SELECT DISTINCT location FROM jobs WHERE work_mode IS NULL
+        ''')
+        raw_locations = [row[0] for row in cursor.fetchall()]
+        for raw in raw_locations:
+            parsed = parse_location(raw)
+            self._store_location(cursor, parsed)
+            cursor.execute('''
+                UPDATE jobs SET city_id = ?, region = ?, work_mode = ?
+                WHERE location = ? AND work_mode IS NULL
+            ''', (parsed.city_id, parsed.region, parsed.work_mode or 'unknown', raw))
+        if raw_locations:
+            print(f"Normalized {len(raw_locations)} distinct job locations")
+    
+    def _store_location(self, cursor, parsed):
+        """Add a city outside the gazetteer to the locations table"""
+        if parsed.city_id:
+            cursor.execute('''
+                INSERT OR IGNORE INTO locations (city_id, city, region, country)
+                VALUES (?, ?, ?, ?)
+            ''', (parsed.city_id, parsed.city, parsed.region, parsed.country))
+    
+    def insert_jobs(self, jobs):
+        """Insert job listings into database, consuming any iterable of job records"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        count = self._insert(cursor, jobs)
+        
+        conn.commit()
+        conn.close()
+        print(f"Inserted {count} jobs into database")
+        return count
+    
+    def _insert(self, cursor, jobs):
+        count = 0
+        for job in jobs:
+            parsed = parse_location(job.location)
+            self._store_location(cursor, parsed)
+            cursor.execute('''
+                INSERT INTO jobs (title, company, location, skills, date_posted, source,
+                                  city_id, region, work_mode, page_digest)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (job.title, job.company, job.location,
+                  job.skills, job.date_posted, job.source,
+                  parsed.city_id, parsed.region, parsed.work_mode or 'unknown', job.page_digest))
+            count += 1
+        return count
+    
+    def replace_page_jobs(self, page_digests, jobs):
+        """Replace the jobs stored for archived pages with re-parsed ones in one transaction.
+
+        Postings that already have a row (same title, company, location and
+        source) are skipped, so replay never duplicates jobs stored from
+        another page or dropped as repeats by the scheduler. A posting that
+        appears on several of the replayed pages is written once.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany('DELETE FROM jobs WHERE page_digest = ?', ((digest,) for digest in page_digests))
+        
+        def new_postings():
+            accepted = set()
+            for job in jobs:
+                key = (job.title, job.company, job.location, job.source)
+                if key in accepted:
+                    continue
+                cursor.execute('''
+                    SELECT 1 FROM jobs
+                    WHERE title = ? AND company = ? AND location = ? AND source = ?
+                    LIMIT 1
+                ''', key)
+                if cursor.fetchone() is None:
+                    accepted.add(key)
+                    yield job
+        
+        # Materialized so the lookup cursor isn't reused while inserting
+        count = self._insert(cursor, list(new_postings()))
+        
+        conn.commit()
+        conn.close()
+        return count
+    
+    def iter_jobs(self, keyword=None, batch_size=1000):
+        """Stream jobs from the database as job records, optionally filtered by keyword"""
+        columns = 'id, title, company, location, skills, date_posted, source, created_at, page_digest'
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            if keyword:
+                cursor.execute(f'''
+                    SELECT {columns} FROM jobs 
+                    WHERE title LIKE ? OR skills LIKE ?
+                    ORDER BY created_at DESC
+                ''', (f'%{keyword}%', f'%{keyword}%'))
+            else:
+                cursor.execute(f'SELECT {columns} FROM jobs ORDER BY created_at DESC')
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield job_from_row(row)
+        finally:
+            conn.close()
+    
+    def get_all_jobs(self):
+        """Retrieve all jobs from database"""
+        return list(self.iter_jobs())
+    
+    def get_jobs_by_keyword(self, keyword):
+        """Get jobs filtered by keyword"""
+        return list(self.iter_jobs(keyword))
+    
+    def get_top_cities(self, limit=5, keyword=None, region=None, city_ids=None, work_mode=None):
+        """Count jobs per canonical city using the indexed location columns"""
+        conditions = ['jobs.city_id IS NOT NULL']
+        params = []
+        if keyword:
+            conditions.append('(jobs.title LIKE ? OR jobs.skills LIKE ?)')
+            params.extend([f'%{keyword}%', f'%{keyword}%'])
+        if region:
+            conditions.append('jobs.region = ?')
+            params.append(region)
+        if city_ids is not None:
+            if not city_ids:
+                return []
+            conditions.append(f"jobs.city_id IN ({', '.join('?' * len(city_ids))})")
+            params.extend(city_ids)
+        if work_mode:
+            conditions.append('jobs.work_mode = ?')
+            params.append(work_mode)
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT locations.city, locations.region, COUNT(*) AS job_count
+            FROM jobs JOIN locations ON locations.city_id = jobs.city_id
+            WHERE {' AND '.join(conditions)}
+            GROUP BY jobs.city_id
+            ORDER BY job_count DESC, locations.city
+            LIMIT ?
+        ''', params + [limit])
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [(f"{city}, {region}" if region else city, count) for city, region, count in rows]
+    
+    def find_city(self, name):
+        """Look up a canonical city by free-text name, returning a City or None"""
+        city_id = parse_location(name).city_id
+        if not city_id:
+            # A bare state that is also a city ("New York", "Washington") names the city here
+            entry = CITY_NAME_INDEX.get(slugify(name))
+            city_id = entry[0] if entry else None
+        if not city_id:
+            return None
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {', '.join(City._fields)} FROM locations WHERE city_id = ?
+        ''', (city_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return City(*row) if row else None
+    
+    def get_city_ids_within(self, latitude, longitude, radius_km):
+        """Get ids of cities within radius_km of a point"""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        # The bounding box uses the geo index; the exact distance check runs on the few cities inside it
+        cursor.execute('''
+            SELECT city_id, latitude, longitude FROM locations
+            WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?
+        ''', (min_lat, max_lat, min_lon, max_lon))
+        rows = cursor.fetchall()
+        conn.close()
+        return [
+            city_id for city_id, lat, lon in rows
+            if haversine_km(latitude, longitude, lat, lon) <= radius_km
+        ]
+    
+    def count_locations(self):
+        """Count distinct canonical cities with jobs"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(DISTINCT city_id) FROM jobs WHERE city_id IS NOT NULL')
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    
+    def clear_old_data(self):
+        """Clear old job data (older than 30 days)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        cursor.execute('DELETE FROM jobs WHERE date_posted < ?', (thirty_days_ago,))
+        
+        conn.commit()
+        conn.close()
@@ -0,0 +1,540 @@
+import json
+import requests
+from bs4 import BeautifulSoup
+import time
+import random
+import sys
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+SKILLS_KEYWORDS = [
+    'python', 'javascript', 'java', 'react', 'node.js', 'aws', 'docker',
+    'kubernetes', 'sql', 'mongodb', 'postgresql', 'git', 'linux',
+    'typescript', 'vue.js', 'angular', 'django', 'flask', 'tensorflow',
+    'pytorch', 'pandas', 'numpy', 'scikit-learn', 'tableau', 'power bi',
+    'c++', 'go', 'rust', 'scala', 'r', 'matlab', 'spark', 'hadoop',
+    'elasticsearch', 'redis', 'nginx', 'apache', 'jenkins', 'gitlab'
+]
+
+# Fields every source must produce, in the order stored in the jobs table
+JOB_FIELDS = ('title', 'company', 'location', 'skills', 'date_posted', 'source')
+
+# Common job record produced by every source and read back from the database.
+# A namedtuple has no per-instance __dict__, so it is far smaller than a dict.
+# id and created_at are only set on records loaded from the database;
+# page_digest names the archived page a record was parsed from, if any.
+JobRecord = namedtuple('JobRecord', JOB_FIELDS + ('id', 'created_at', 'page_digest'),
+                       defaults=(None, None, None))
+
+
+class SourceError(Exception):
+    """A source could not produce results for a query"""
+
+
+class SourceTimeout(SourceError):
+    """A source ran past its timeout; jobs holds what it collected in time"""
+
+    def __init__(self, message, jobs=()):
+        super().__init__(message)
+        self.jobs = list(jobs)
+
+
+def extract_skills(text):
+    """Extract technical skills from job description"""
+    text_lower = text.lower()
+    found_skills = []
+
+    for skill in SKILLS_KEYWORDS:
+        if skill in text_lower:
+            found_skills.append(skill.title())
+
+    return found_skills
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def make_job(title, company, location, skills, date_posted, source, id=None, created_at=None,
+             page_digest=None):
+    """Build the common job record shared by all sources.
+
+    Fields that repeat across many jobs are interned so each distinct value
+    is stored once no matter how many records refer to it.
+    """
+    return JobRecord(_intern(title), _intern(company), _intern(location), skills,
+                     _intern(date_posted), _intern(source), id, created_at, page_digest)
+
+
+def job_from_row(row):
+    """Build a job record from a jobs table row (id, title, ..., created_at, page_digest)"""
+    return make_job(row[1], row[2], row[3], row[4], row[5], row[6], row[0], row[7], row[8])
+
+
+class RateLimiter:
+    """Enforce a minimum interval between requests made by one source"""
+
+    def __init__(self, min_interval=1.0, jitter=0.0, clock=time.monotonic):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def wait(self):
+        """Block until the next request is allowed"""
+        with self._lock:
+            now = self.clock()
+            delay = max(0.0, self._next_allowed - now)
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """Skip a source after repeated failures until a cool-down has passed"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=300, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Return True if a run may be attempted"""
+        with self._lock:
+            return self._state() != self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # A failed trial run while half-open re-opens the breaker straight away
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = self.clock()
+
+
+class JobSource:
+    """Base class for job sources.
+
+    A source fetches raw payloads, parses each payload into raw items and
+    normalizes each item into the common job record built by make_job().
+
+    clock is the monotonic time used for rate limiting, the breaker's
+    cool-down and run deadlines; simulations can pass their own.
+    """
+
+    name = 'base'
+    # Set when normalize() stamps records with today's date instead of one from the payload
+    date_from_fetch = False
+
+    def __init__(self, enabled=True, min_interval=1.0, jitter=0.0, timeout=60,
+                 failure_threshold=3, reset_timeout=300, archive=None, clock=time.monotonic):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.archive = archive
+        self.clock = clock
+        self.rate_limiter = RateLimiter(min_interval, jitter, clock)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock)
+
+    def fetch(self, keyword, location):
+        """Yield raw payloads (pages, API responses) for a query"""
+        raise NotImplementedError
+
+    def parse(self, payload):
+        """Yield raw job items found in a payload"""
+        raise NotImplementedError
+
+    def normalize(self, item):
+        """Turn a raw item into a job record, or None to drop it"""
+        raise NotImplementedError
+
+    def serialize_payload(self, payload):
+        """Bytes to archive for a payload, or None if it is not worth keeping"""
+        return payload if isinstance(payload, bytes) else None
+
+    def deserialize_payload(self, data):
+        """Rebuild a payload from archived bytes"""
+        return data
+
+    def iter_jobs(self, keyword="software developer", location="", deadline=None, pages=None):
+        """Run fetch, parse and normalize, yielding job records as they are parsed.
+
+        If pages is a list, the digest of each archived page is appended to
+        it once all of the page's jobs have been yielded.
+        """
+        for payload in self.fetch(keyword, location):
+            page_digest = None
+            if self.archive is not None:
+                data = self.serialize_payload(payload)
+                if data is not None:
+                    page_digest = self.archive.put(data, self.name, keyword, location)
+            for job in self._normalize_all(payload):
+                yield job._replace(page_digest=page_digest) if page_digest else job
+            if page_digest and pages is not None:
+                pages.append(page_digest)
+            # Stop paging once the run has used up its time budget
+            if deadline is not None and self.clock() >= deadline:
+                raise SourceTimeout(f"{self.name} ran past its {self.timeout}s timeout")
+
+    def collect(self, keyword="software developer", location="", deadline=None, pages=None):
+        """Run fetch, parse and normalize and return the job records"""
+        jobs = []
+        try:
+            for job in self.iter_jobs(keyword, location, deadline, pages):
+                jobs.append(job)
+        except SourceTimeout as e:
+            e.jobs = jobs
+            raise
+        return jobs
+
+    def reparse(self, data, page_digest=None, fetched_date=None):
+        """Re-run parse and normalize over an archived payload, without fetching"""
+        for job in self._normalize_all(self.deserialize_payload(data)):
+            if self.date_from_fetch and fetched_date:
+                job = job._replace(date_posted=_intern(fetched_date))
+            yield job._replace(page_digest=page_digest)
+
+    def _normalize_all(self, payload):
+        for item in self.parse(payload):
+            try:
+                job = self.normalize(item)
+            except Exception as e:
+                print(f"[{self.name}] Error normalizing job: {e}")
+                continue
+            if job:
+                yield job
+
+
+class IndeedSource(JobSource):
+    """Scrape job listings from Indeed search result pages"""
+
+    name = 'Indeed'
+    date_from_fetch = True
+    base_url = "https://www.indeed.com/jobs"
+
+    job_selectors = [
+        'div[data-jk]',  # Main job container
+        '.jobsearch-SerpJobCard',  # Alternative selector
+        '.job_seen_beacon'  # Another alternative
+    ]
+    title_selectors = ['h2.jobTitle a span', '.jobTitle a', 'h2 a span[title]', '.jobTitle']
+    company_selectors = ['.companyName', 'span.companyName a', 'span.companyName', '[data-testid="company-name"]']
+    location_selectors = ['.companyLocation', '[data-testid="job-location"]', '.locationsContainer']
+    summary_selectors = ['.summary', '.job-snippet', '[data-testid="job-snippet"]']
+
+    def __init__(self, session=None, max_pages=3, min_interval=1.0, jitter=2.0, **kwargs):
+        super().__init__(min_interval=min_interval, jitter=jitter, **kwargs)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+        self.session = session
+        self.max_pages = max_pages
+
+    def fetch(self, keyword, location):
+        failed_pages = 0
+        for page in range(self.max_pages):
+            params = {
+                'q': keyword,
+                'l': location,
+                'start': page * 10
+            }
+            self.rate_limiter.wait()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=10)
+            except Exception as e:
+                print(f"Error scraping page {page + 1}: {e}")
+                failed_pages += 1
+                continue
+            if response.status_code != 200:
+                print(f"Failed to fetch page {page + 1}")
+                failed_pages += 1
+                continue
+            yield response.content
+
+        if failed_pages == self.max_pages:
+            raise SourceError(f"all {self.max_pages} pages failed")
+
+    def parse(self, payload):
+        soup = payload if isinstance(payload, BeautifulSoup) else BeautifulSoup(payload, 'html.parser')
+
+        job_cards = []
+        for selector in self.job_selectors:
+            job_cards = soup.select(selector)
+            if job_cards:
+                break
+
+        for card in job_cards:
+            try:
+                yield {
+                    'title': self._first_text(card, self.title_selectors),
+                    'company': self._first_text(card, self.company_selectors),
+                    'location': self._first_text(card, self.location_selectors),
+                    'summary': self._first_text(card, self.summary_selectors) or ""
+                }
+            except Exception as e:
+                print(f"Error parsing job card: {e}")
+                continue
+
+    def normalize(self, item):
+        if not (item['title'] and item['company']):  # Only keep jobs with essential data
+            return None
+        skills = extract_skills(item['title'] + " " + item['summary'])
+        return make_job(item['title'], item['company'], item['location'] or 'Not specified',
+                        ', '.join(skills), datetime.now().strftime('%Y-%m-%d'), self.name)
+
+    @staticmethod
+    def _first_text(card, selectors):
+        for selector in selectors:
+            elem = card.select_one(selector)
+            if elem:
+                return elem.get_text(strip=True)
+        return None
+
+
+class MockSource(JobSource):
+    """Generate mock job data for demonstration"""
+
+    name = 'Mock Data'
+
+    job_titles = [
+        "Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer",
+        "Frontend Developer", "Backend Developer", "Full Stack Developer", "Data Analyst",
+        "Machine Learning Engineer", "Cloud Architect", "Cybersecurity Analyst",
+        "Mobile Developer", "QA Engineer", "UX Designer", "Technical Writer"
+    ]
+
+    companies = [
+        "Google", "Microsoft", "Amazon", "Apple", "Meta", "Netflix", "Spotify",
+        "Uber", "Airbnb", "Tesla", "Stripe", "Shopify", "Zoom", "Slack", "Adobe"
+    ]
+
+    cities = [
+        "San Francisco, CA", "New York, NY", "Seattle, WA", "Austin, TX",
+        "Boston, MA", "Los Angeles, CA", "Chicago, IL", "Denver, CO",
+        "Atlanta, GA", "Miami, FL", "Portland, OR", "San Diego, CA"
+    ]
+
+    skills_pool = [
+        "Python", "JavaScript", "React", "Node.js", "AWS", "Docker", "Kubernetes",
+        "SQL", "MongoDB", "PostgreSQL", "Git", "Linux", "Java", "C++", "Go",
+        "TypeScript", "Vue.js", "Angular", "Django", "Flask", "TensorFlow",
+        "PyTorch", "Pandas", "NumPy", "Scikit-learn", "Tableau", "Power BI"
+    ]
+
+    def __init__(self, count=50, min_interval=0.0, **kwargs):
+        super().__init__(min_interval=min_interval, **kwargs)
+        self.count = count
+
+    def fetch(self, keyword, location):
+        yield self.count
+
+    def parse(self, payload):
+        for i in range(payload):
+            # Random date within last 30 days
+            days_ago = random.randint(0, 30)
+            # Random skills (2-6 skills per job)
+            num_skills = random.randint(2, 6)
+            yield {
+                'title': random.choice(self.job_titles),
+                'company': random.choice(self.companies),
+                'location': random.choice(self.cities),
+                'skills': random.sample(self.skills_pool, num_skills),
+                'date_posted': (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+            }
+
+    def normalize(self, item):
+        return make_job(item['title'], item['company'], item['location'],
+                        ', '.join(item['skills']), item['date_posted'], self.name)
+
+
+class ApiSource(JobSource):
+    """Fetch jobs from a job API (example with a mock API)"""
+
+    # This is a placeholder for API-based scraping
+    # You would replace fetch() with actual API calls to services like:
+    # - Adzuna API
+    # - Reed API
+
+    name = 'API'
+
+    def serialize_payload(self, payload):
+        return json.dumps(payload).encode('utf-8')
+
+    def deserialize_payload(self, data):
+        return json.loads(data)
+
+    def fetch(self, keyword, location):
+        self.rate_limiter.wait()
+        # Mock API response structure
+        yield [
+            {
+                "title": "Senior Python Developer",
+                "company": "TechCorp",
+                "location": "San Francisco, CA",
+                "description": "Looking for a senior Python developer with Django experience...",
+                "posted_date": "2024-01-15"
+            },
+        ]
+
+    def parse(self, payload):
+        yield from payload
+
+    def normalize(self, item):
+        title = item.get('title', '')
+        company = item.get('company', '')
+        if not (title and company):
+            return None
+        skills = extract_skills(title + " " + item.get('description', ''))
+        return make_job(title, company, item.get('location') or 'Not specified', ', '.join(skills),
+                        item.get('posted_date') or datetime.now().strftime('%Y-%m-%d'), self.name)
+
+
+class SourceRunner:
+    """Run enabled sources in parallel, isolating slow or failing ones"""
+
+    def __init__(self, sources, max_workers=None):
+        self.sources = list(sources)
+        self.max_workers = max_workers
+
+    def enabled_sources(self):
+        return [source for source in self.sources if source.enabled]
+
+    def run(self, keyword="software developer", location=""):
+        """Scrape all enabled sources and return the combined job records"""
+        return list(self.stream(keyword, location))
+
+    def stream(self, keyword="software developer", location="", pages=None):
+        """Scrape all enabled sources, yielding each source's records as it finishes.
+
+        If pages is a list, it receives the digests of the archived pages the
+        yielded records came from.
+        """
+        runnable = []
+        for source in self.enabled_sources():
+            if source.breaker.allow():
+                runnable.append(source)
+            else:
+                print(f"[{source.name}] Circuit open, skipping")
+
+        for _, jobs, digests in self.execute((source, keyword, location) for source in runnable):
+            if pages is not None:
+                pages.extend(digests)
+            if jobs:
+                yield from jobs
+
+    def execute(self, queries):
+        """Run (source, keyword, location) queries in parallel, each bounded by its source's timeout.
+
+        Yields (query, jobs, pages) as queries finish, where pages are the
+        digests of the archived pages jobs came from. A query that overruns its
+        timeout yields what it collected in time, or None if it never returned,
+        and counts as a failure on its source's breaker, as does one that raises.
+        Callers mark pages processed once they have stored the jobs.
+        """
+        queries = list(queries)
+        if not queries:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers or len(queries),
+                                      thread_name_prefix='job-source')
+        # Deadlines start when a query starts running, not while it waits for a worker.
+        # Each is on its own source's clock.
+        deadlines = {}
+        pages = {}
+
+        def run(index, source, keyword, location):
+            deadlines[index] = source.clock() + source.timeout
+            pages[index] = []
+            return source.collect(keyword, location, deadlines[index], pages[index])
+
+        def remaining(index, source):
+            return deadlines[index] - source.clock()
+
+        try:
+            pending = {
+                executor.submit(run, index, *query): (index, query)
+                for index, query in enumerate(queries)
+            }
+            while pending:
+                started = [remaining(index, query[0]) for index, query in pending.values() if index in deadlines]
+                timeout = max(0.0, min(started)) if started else 0.1
+                wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future, (index, query) in list(pending.items()):
+                    source = query[0]
+                    if future.done():
+                        del pending[future]
+                        jobs = self._result(source, future)
+                        yield query, jobs, list(pages.get(index, ())) if jobs is not None else []
+                    elif index in deadlines and remaining(index, source) <= 0:
+                        # The source is blocked past its deadline; leave its thread behind.
+                        # Pages it archives from now on stay unprocessed for replay to backfill.
+                        del pending[future]
+                        print(f"[{source.name}] Timed out after {source.timeout}s")
+                        source.breaker.record_failure()
+                        yield query, None, []
+        finally:
+            # Don't wait for sources that overran their timeout
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _result(self, source, future):
+        try:
+            jobs = future.result()
+        except SourceTimeout as e:
+            print(f"[{source.name}] Timed out after {source.timeout}s, keeping {len(e.jobs)} partial results")
+            source.breaker.record_failure()
+            return e.jobs
+        except Exception as e:
+            print(f"[{source.name}] Failed: {e}")
+            source.breaker.record_failure()
+            return None
+        source.breaker.record_success()
+        print(f"[{source.name}] Collected {len(jobs)} jobs")
+        return jobs
+
+    def status(self):
+        """Report enabled flag and breaker state for each source"""
+        return [
+            {
+                'name': source.name,
+                'enabled': source.enabled,
+                'circuit': source.breaker.state,
+                'failures': source.breaker.failures
+            }
+            for source in self.sources
+        ]
+
+
+# Sources that can re-parse archived payloads, keyed by the name stored with each page
+SOURCE_TYPES = {source.name: source for source in (IndeedSource, ApiSource)}
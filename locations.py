@@ -0,0 +1,203 @@
+import math
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Normalized form of a raw location string. city_id and region are None when
+# the string names no city (placeholders, plain "Remote") or only a region.
+# work_mode is 'onsite', 'remote', 'hybrid' or None when nothing is known.
+Location = namedtuple('Location', ['city_id', 'city', 'region', 'country', 'work_mode'])
+
+UNKNOWN_LOCATION = Location(None, None, None, None, None)
+
+# A row of the locations table; latitude and longitude are None for cities outside the gazetteer
+City = namedtuple('City', ['city_id', 'city', 'region', 'country', 'latitude', 'longitude'])
+
+PLACEHOLDERS = {'', 'n/a', 'na', 'not specified', 'none', 'unknown', '-'}
+
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon',
+    'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia',
+    'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming'
+}
+
+REGION_CODES = {name.lower(): code for code, name in US_STATES.items()}
+REGION_CODES.update({code.lower(): code for code in US_STATES})
+
+# Offline gazetteer: (city, state, latitude, longitude, aliases).
+# Aliases must not collide with state names or codes: a bare state is
+# matched before city names, so e.g. "LA" always means Louisiana.
+GAZETTEER = [
+    ("San Francisco", "CA", 37.7749, -122.4194, ["sf", "san fran"]),
+    ("San Jose", "CA", 37.3382, -121.8863, []),
+    ("Oakland", "CA", 37.8044, -122.2712, []),
+    ("Palo Alto", "CA", 37.4419, -122.1430, []),
+    ("Mountain View", "CA", 37.3861, -122.0839, []),
+    ("Sunnyvale", "CA", 37.3688, -122.0363, []),
+    ("Santa Clara", "CA", 37.3541, -121.9552, []),
+    ("Los Angeles", "CA", 34.0522, -118.2437, []),
+    ("San Diego", "CA", 32.7157, -117.1611, []),
+    ("Irvine", "CA", 33.6846, -117.8265, []),
+    ("Sacramento", "CA", 38.5816, -121.4944, []),
+    ("Seattle", "WA", 47.6062, -122.3321, []),
+    ("Bellevue", "WA", 47.6101, -122.2015, []),
+    ("Redmond", "WA", 47.6740, -122.1215, []),
+    ("Portland", "OR", 45.5152, -122.6784, []),
+    ("New York", "NY", 40.7128, -74.0060, ["new york city", "nyc", "manhattan", "brooklyn"]),
+    ("Jersey City", "NJ", 40.7178, -74.0431, []),
+    ("Boston", "MA", 42.3601, -71.0589, []),
+    ("Cambridge", "MA", 42.3736, -71.1097, []),
+    ("Philadelphia", "PA", 39.9526, -75.1652, []),
+    ("Pittsburgh", "PA", 40.4406, -79.9959, []),
+    ("Washington", "DC", 38.9072, -77.0369, ["washington dc", "washington d.c."]),
+    ("Arlington", "VA", 38.8816, -77.0910, []),
+    ("Baltimore", "MD", 39.2904, -76.6122, []),
+    ("Atlanta", "GA", 33.7490, -84.3880, []),
+    ("Miami", "FL", 25.7617, -80.1918, []),
+    ("Tampa", "FL", 27.9506, -82.4572, []),
+    ("Orlando", "FL", 28.5383, -81.3792, []),
+    ("Charlotte", "NC", 35.2271, -80.8431, []),
+    ("Raleigh", "NC", 35.7796, -78.6382, []),
+    ("Durham", "NC", 35.9940, -78.8986, []),
+    ("Nashville", "TN", 36.1627, -86.7816, []),
+    ("Chicago", "IL", 41.8781, -87.6298, []),
+    ("Detroit", "MI", 42.3314, -83.0458, []),
+    ("Minneapolis", "MN", 44.9778, -93.2650, []),
+    ("Columbus", "OH", 39.9612, -82.9988, []),
+    ("Cleveland", "OH", 41.4993, -81.6944, []),
+    ("Indianapolis", "IN", 39.7684, -86.1581, []),
+    ("Madison", "WI", 43.0731, -89.4012, []),
+    ("St. Louis", "MO", 38.6270, -90.1994, ["saint louis", "st louis"]),
+    ("Kansas City", "MO", 39.0997, -94.5786, []),
+    ("Austin", "TX", 30.2672, -97.7431, []),
+    ("Dallas", "TX", 32.7767, -96.7970, []),
+    ("Houston", "TX", 29.7604, -95.3698, []),
+    ("San Antonio", "TX", 29.4241, -98.4936, []),
+    ("Plano", "TX", 33.0198, -96.6989, []),
+    ("Denver", "CO", 39.7392, -104.9903, []),
+    ("Boulder", "CO", 40.0150, -105.2705, []),
+    ("Salt Lake City", "UT", 40.7608, -111.8910, ["slc"]),
+    ("Phoenix", "AZ", 33.4484, -112.0740, []),
+    ("Las Vegas", "NV", 36.1699, -115.1398, []),
+]
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def make_city_id(city, region, country='US'):
+    return f"{country}-{region}-{slugify(city)}".lower()
+
+
+def _build_index():
+    by_city_region = {}
+    by_name = {}
+    records = []
+    for city, region, latitude, longitude, aliases in GAZETTEER:
+        city_id = make_city_id(city, region)
+        records.append((city_id, city, region, 'US', latitude, longitude))
+        for name in [city] + aliases:
+            key = slugify(name)
+            by_city_region[(key, region)] = (city_id, city, region)
+            # The first (largest) city wins when a bare name is ambiguous
+            by_name.setdefault(key, (city_id, city, region))
+    return by_city_region, by_name, records
+
+
+CITY_INDEX, CITY_NAME_INDEX, GAZETTEER_RECORDS = _build_index()
+
+WORK_MODE_PARTS = {'remote': 'remote', 'hybrid': 'hybrid', 'hybrid remote': 'hybrid'}
+COUNTRY_PARTS = {'us', 'usa', 'u.s', 'u.s.a', 'united states'}
+
+_REMOTE_PREFIX = re.compile(r'^(?:(hybrid)(?:\s+remote|\s+work)?|(?:temporarily\s+)?(remote))\s+(?:in|from|-|:)\s*', re.I)
+_REMOTE_SUFFIX = re.compile(r'[\s,(\-]*\b(hybrid(?:\s+remote)?|remote)\)?\s*$', re.I)
+_EXTRA_LOCATIONS = re.compile(r'\s*\+\s*\d+\s+locations?$', re.I)
+_POSTCODE = re.compile(r'\s+\d{5}(?:-\d{4})?\b')
+_PARENTHETICAL = re.compile(r'\s*\([^)]*\)')
+
+
+@lru_cache(maxsize=65536)
+def parse_location(raw):
+    """Map a raw location string to its canonical Location"""
+    if raw is None:
+        return UNKNOWN_LOCATION
+    # Some listings separate extra details with bullets: "Denver, CO • Hybrid"
+    text = ' '.join(raw.replace('•', ',').split())
+    if text.lower() in PLACEHOLDERS:
+        return UNKNOWN_LOCATION
+
+    work_mode = 'onsite'
+    text = _EXTRA_LOCATIONS.sub('', text)
+
+    match = _REMOTE_PREFIX.match(text)
+    if match:
+        work_mode = 'hybrid' if match.group(1) else 'remote'
+        text = text[match.end():]
+    match = _REMOTE_SUFFIX.search(text)
+    if match and match.start() > 0:
+        work_mode = 'hybrid' if match.group(1).lower().startswith('hybrid') else 'remote'
+        text = text[:match.start()]
+
+    text = _PARENTHETICAL.sub('', text)
+    text = _POSTCODE.sub('', text).strip(' ,-')
+
+    lowered = text.lower()
+    if lowered in ('remote', 'anywhere', 'united states', 'usa', 'us'):
+        mode = 'remote' if lowered in ('remote', 'anywhere') else work_mode
+        return Location(None, None, None, 'US', mode)
+    if lowered.startswith('hybrid') and ',' not in lowered:
+        return Location(None, None, None, None, 'hybrid')
+
+    parts = [part.strip() for part in text.split(',') if part.strip()]
+    # The work mode can also be its own leading part: "Remote, US", "Hybrid, Austin, TX"
+    if parts and parts[0].lower() in WORK_MODE_PARTS:
+        work_mode = WORK_MODE_PARTS[parts[0].lower()]
+        parts = parts[1:]
+    country = None
+    if parts and parts[-1].lower().rstrip('.') in COUNTRY_PARTS:
+        country = 'US'
+        parts = parts[:-1]
+    if not parts:
+        return Location(None, None, None, country, work_mode)
+
+    region = None
+    if len(parts) > 1:
+        region = REGION_CODES.get(parts[1].lower().rstrip('.'))
+    elif parts[0].lower() in REGION_CODES:
+        # A bare state such as "California" or "TX"
+        return Location(None, None, REGION_CODES[parts[0].lower()], 'US', work_mode)
+
+    key = slugify(parts[0])
+    entry = CITY_INDEX.get((key, region)) if region else CITY_NAME_INDEX.get(key)
+    if entry:
+        city_id, city, region = entry
+        return Location(city_id, city, region, 'US', work_mode)
+    if region:
+        # Not in the gazetteer, but "City, ST" is still unambiguous
+        city = parts[0].title() if parts[0].islower() else parts[0]
+        return Location(make_city_id(city, region), city, region, 'US', work_mode)
+    return Location(None, None, None, None, work_mode)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a circle, for an indexed pre-filter"""
+    lat_delta = radius_km / 111.0
+    lon_delta = radius_km / (111.0 * max(math.cos(math.radians(latitude)), 0.01))
+    return latitude - lat_delta, latitude + lat_delta, longitude - lon_delta, longitude + lon_delta
@@ -0,0 +1,281 @@
+"""
+Compressed, content-addressed archive of fetched pages.
+
+Each page is compressed on its own and appended to a segment file. An SQLite
+index maps the page's SHA-256 digest to (segment, offset, length), so a page
+can be sliced straight out of a memory-mapped segment. Pages with identical
+content are stored once.
+
+Archived pages can be replayed offline to re-run the parsers and backfill or
+fix the jobs table without touching the network:
+
+    python page_archive.py [--fix] [--source Indeed] [--since 2024-01-01]
+
+A plain replay backfills pages that never finished ingest. After fixing
+broken selectors, use --fix to re-parse pages that were already ingested.
+"""
+
+import argparse
+import gzip
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_CODEC = 'zstd' if zstandard is not None else 'gzip'
+
+
+def compress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("page was archived with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """Append-only page store made of compressed segments and an offset index"""
+
+    def __init__(self, directory='page_archive', segment_max_bytes=64 * 1024 * 1024, codec=DEFAULT_CODEC):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.codec = codec
+        self.index_path = os.path.join(directory, 'index.db')
+        self._lock = threading.Lock()
+        self._maps = {}
+        os.makedirs(directory, exist_ok=True)
+        self.init_index()
+
+    def init_index(self):
+        conn = sqlite3.connect(self.index_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                digest TEXT PRIMARY KEY,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                codec TEXT NOT NULL,
+                source TEXT NOT NULL,
+                keyword TEXT,
+                location TEXT,
+                fetched_at TIMESTAMP NOT NULL,
+                processed_at TIMESTAMP
+            )
+        ''')
+        # processed_at is set once a page's jobs have gone through ingest or replay
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(pages)')}
+        if 'processed_at' not in columns:
+            conn.execute('ALTER TABLE pages ADD COLUMN processed_at TIMESTAMP')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_source_fetched ON pages (source, fetched_at)')
+        conn.commit()
+        conn.close()
+
+    def segment_path(self, segment):
+        return os.path.join(self.directory, f'segment-{segment:05d}.dat')
+
+    def _current_segment(self, conn):
+        row = conn.execute('SELECT MAX(segment) FROM pages').fetchone()
+        segment = row[0] or 1
+        path = self.segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_max_bytes:
+            segment += 1
+        return segment
+
+    def put(self, data, source, keyword=None, location=None):
+        """Archive a page and return its digest; content already archived is not stored again"""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            conn = sqlite3.connect(self.index_path)
+            try:
+                if conn.execute('SELECT 1 FROM pages WHERE digest = ?', (digest,)).fetchone():
+                    return digest
+
+                blob = compress(data, self.codec)
+                segment = self._current_segment(conn)
+                with open(self.segment_path(segment), 'ab') as f:
+                    offset = f.tell()
+                    f.write(blob)
+
+                conn.execute('''
+                    INSERT INTO pages (digest, segment, offset, length, codec, source, keyword, location, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (digest, segment, offset, len(blob), self.codec, source, keyword, location,
+                      datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+                conn.commit()
+            finally:
+                conn.close()
+        return digest
+
+    def mark_processed(self, digests):
+        """Record that the jobs on these pages have been ingested"""
+        processed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            conn = sqlite3.connect(self.index_path)
+            conn.executemany('UPDATE pages SET processed_at = ? WHERE digest = ?',
+                             ((processed_at, digest) for digest in digests))
+            conn.commit()
+            conn.close()
+
+    def _segment_map(self, segment, end):
+        """Memory map for a segment, remapped if the segment has grown past the old map"""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            with open(self.segment_path(segment), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def read(self, segment, offset, length, codec):
+        """Read and decompress one page given its index entry"""
+        with self._lock:
+            mapped = self._segment_map(segment, offset + length)
+            blob = mapped[offset:offset + length]
+        return decompress(blob, codec)
+
+    def get(self, digest):
+        """Return the page content for a digest, or None if it is not archived"""
+        conn = sqlite3.connect(self.index_path)
+        row = conn.execute('SELECT segment, offset, length, codec FROM pages WHERE digest = ?', (digest,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return self.read(*row)
+
+    def iter_pages(self, source=None, since=None, unprocessed_only=False):
+        """Stream index entries (digest, segment, offset, length, codec, source, fetched_at) in fetch order"""
+        conditions = []
+        params = []
+        if unprocessed_only:
+            conditions.append('processed_at IS NULL')
+        if source:
+            conditions.append('source = ?')
+            params.append(source)
+        if since:
+            conditions.append('fetched_at >= ?')
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        conn = sqlite3.connect(self.index_path)
+        try:
+            cursor = conn.execute(f'''
+                SELECT digest, segment, offset, length, codec, source, fetched_at
+                FROM pages {where}
+                ORDER BY fetched_at
+            ''', params)
+            for row in cursor:
+                yield row
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Report page count and raw vs compressed size"""
+        conn = sqlite3.connect(self.index_path)
+        pages, compressed = conn.execute('SELECT COUNT(*), COALESCE(SUM(length), 0) FROM pages').fetchone()
+        conn.close()
+        return {'pages': pages, 'compressed_bytes': compressed, 'codec': self.codec}
+
+    def close(self):
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+
+# Replay: each worker process opens the archive once and re-parses the pages it is sent
+_worker_archive = None
+
+
+def _init_replay_worker(directory):
+    global _worker_archive
+    _worker_archive = PageArchive(directory)
+
+
+def _reparse_pages(entries):
+    from job_sources import SOURCE_TYPES
+
+    sources = {}
+    results = []
+    for digest, segment, offset, length, codec, source_name, fetched_at in entries:
+        source_type = SOURCE_TYPES.get(source_name)
+        if source_type is None:
+            continue
+        source = sources.get(source_name)
+        if source is None:
+            source = sources[source_name] = source_type(min_interval=0.0)
+        try:
+            data = _worker_archive.read(segment, offset, length, codec)
+            jobs = list(source.reparse(data, digest, fetched_at[:10]))
+        except Exception as e:
+            print(f"[{source_name}] Could not re-parse page {digest[:12]}: {e}")
+            continue
+        results.append((digest, jobs))
+    return results
+
+
+def replay(archive, db, source=None, since=None, fix=False, workers=None, batch_size=50):
+    """Re-run parsers over archived pages and write the jobs into db.
+
+    By default only pages that never went through ingest are backfilled,
+    so pages whose jobs were dropped as duplicates or later cleared stay
+    out. With fix=True every matching page is replayed and the jobs
+    previously stored for it are replaced. Either way a posting that
+    already has a row is not inserted again. Returns (pages replayed, jobs
+    written).
+    """
+    # Read the index up front so marking pages processed doesn't contend with an open read
+    entries = list(archive.iter_pages(source, since, unprocessed_only=not fix))
+
+    def batches():
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    pages = 0
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_replay_worker,
+                             initargs=(archive.directory,)) as executor:
+        for results in executor.map(_reparse_pages, batches()):
+            digests = [digest for digest, _ in results]
+            jobs = [job for _, page_jobs in results for job in page_jobs]
+            written += db.replace_page_jobs(digests, jobs)
+            archive.mark_processed(digests)
+            pages += len(results)
+
+    print(f"Replayed {pages} archived pages into {written} jobs")
+    return pages, written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-parse archived pages into the jobs table without network access")
+    parser.add_argument('--archive', default='page_archive', help="archive directory")
+    parser.add_argument('--db', default='jobs.db', help="jobs database")
+    parser.add_argument('--source', help="only replay pages from this source, e.g. Indeed")
+    parser.add_argument('--since', help="only replay pages fetched on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--fix', action='store_true', help="replace jobs already stored for replayed pages")
+    parser.add_argument('--workers', type=int, help="parser processes (default: CPU count)")
+    args = parser.parse_args()
+
+    from job_database import JobDatabase
+
+    replay(PageArchive(args.archive), JobDatabase(args.db), args.source, args.since, args.fix, args.workers)
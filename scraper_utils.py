@@ -4,6 +4,8 @@ import time
 import random
 from datetime import datetime
 import json
+from itertools import chain, islice
+from job_sources import IndeedSource, ApiSource, JOB_FIELDS
 
 class AdvancedJobScraper:
     """Advanced job scraper with multiple sources and better error handling"""
@@ -36,157 +38,49 @@ class AdvancedJobScraper:
     
     def extract_job_data_indeed(self, soup):
         """Extract job data from Indeed page"""
-        jobs = []
-        
-        # Updated selectors for Indeed's current structure
-        job_selectors = [
-            'div[data-jk]',  # Main job container
-            '.jobsearch-SerpJobCard',  # Alternative selector
-            '.job_seen_beacon'  # Another alternative
-        ]
-        
-        job_cards = []
-        for selector in job_selectors:
-            job_cards = soup.select(selector)
-            if job_cards:
-                break
-        
-        for card in job_cards:
-            try:
-                # Try multiple selectors for title
-                title = None
-                title_selectors = [
-                    'h2.jobTitle a span',
-                    '.jobTitle a',
-                    'h2 a span[title]',
-                    '.jobTitle'
-                ]
-                
-                for selector in title_selectors:
-                    title_elem = card.select_one(selector)
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-                        break
-                
-                # Try multiple selectors for company
-                company = None
-                company_selectors = [
-                    '.companyName',
-                    'span.companyName a',
-                    'span.companyName',
-                    '[data-testid="company-name"]'
-                ]
-                
-                for selector in company_selectors:
-                    company_elem = card.select_one(selector)
-                    if company_elem:
-                        company = company_elem.get_text(strip=True)
-                        break
-                
-                # Try multiple selectors for location
-                location = None
-                location_selectors = [
-                    '.companyLocation',
-                    '[data-testid="job-location"]',
-                    '.locationsContainer'
-                ]
-                
-                for selector in location_selectors:
-                    location_elem = card.select_one(selector)
-                    if location_elem:
-                        location = location_elem.get_text(strip=True)
-                        break
-                
-                # Extract job summary/description
-                summary = ""
-                summary_selectors = [
-                    '.summary',
-                    '.job-snippet',
-                    '[data-testid="job-snippet"]'
-                ]
-                
-                for selector in summary_selectors:
-                    summary_elem = card.select_one(selector)
-                    if summary_elem:
-                        summary = summary_elem.get_text(strip=True)
-                        break
-                
-                if title and company:  # Only add if we have essential data
-                    job = {
-                        'title': title,
-                        'company': company,
-                        'location': location or 'Not specified',
-                        'summary': summary,
-                        'date_posted': datetime.now().strftime('%Y-%m-%d'),
-                        'source': 'Indeed'
-                    }
-                    jobs.append(job)
-                    
-            except Exception as e:
-                print(f"Error parsing job card: {e}")
-                continue
-        
-        return jobs
+        source = IndeedSource(self.session)
+        for item in source.parse(soup):
+            job = source.normalize(item)
+            if job:
+                yield job
     
     def scrape_jobs_api(self, keyword="software developer", location="", count=50):
         """Scrape jobs using a job API (example with a mock API)"""
-        # This is a placeholder for API-based scraping
-        # You would replace this with actual API calls to services like:
-        # - Adzuna API
-        # - Reed API
-        # - GitHub Jobs API (deprecated but example)
-        
-        jobs = []
-        
-        # Mock API response structure
-        mock_api_jobs = [
-            {
-                "title": "Senior Python Developer",
-                "company": "TechCorp",
-                "location": "San Francisco, CA",
-                "description": "Looking for a senior Python developer with Django experience...",
-                "posted_date": "2024-01-15"
-            },
-            # Add more mock jobs here
-        ]
-        
-        for job_data in mock_api_jobs:
-            job = {
-                'title': job_data.get('title', ''),
-                'company': job_data.get('company', ''),
-                'location': job_data.get('location', ''),
-                'summary': job_data.get('description', ''),
-                'date_posted': job_data.get('posted_date', datetime.now().strftime('%Y-%m-%d')),
-                'source': 'API'
-            }
-            jobs.append(job)
-        
-        return jobs
+        return islice(ApiSource(min_interval=0.0).iter_jobs(keyword, location), count)
     
     def save_to_csv(self, jobs, filename='jobs.csv'):
-        """Save jobs to CSV file"""
+        """Save jobs to CSV file, streaming records from any iterable"""
         import csv
         
-        if not jobs:
+        jobs = iter(jobs)
+        first = next(jobs, None)
+        if first is None:
             print("No jobs to save")
             return
         
-        fieldnames = ['title', 'company', 'location', 'summary', 'date_posted', 'source']
-        
+        count = 0
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for job in jobs:
-                writer.writerow(job)
+            writer = csv.writer(csvfile)
+            writer.writerow(JOB_FIELDS)
+            for job in chain([first], jobs):
+                writer.writerow(job[:len(JOB_FIELDS)])
+                count += 1
         
-        print(f"Saved {len(jobs)} jobs to {filename}")
+        print(f"Saved {count} jobs to {filename}")
     
     def save_to_json(self, jobs, filename='jobs.json'):
-        """Save jobs to JSON file"""
+        """Save jobs to JSON file, streaming records from any iterable"""
+        count = 0
         with open(filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(jobs, jsonfile, indent=2, ensure_ascii=False)
+            jsonfile.write('[')
+            for job in jobs:
+                record = dict(zip(JOB_FIELDS, job))
+                jsonfile.write(',\n  ' if count else '\n  ')
+                jsonfile.write(json.dumps(record, ensure_ascii=False))
+                count += 1
+            jsonfile.write('\n]\n' if count else ']\n')
         
-        print(f"Saved {len(jobs)} jobs to {filename}")
+        print(f"Saved {count} jobs to {filename}")
 
 # Example usage
 if __name__ == "__main__":
@@ -195,7 +89,7 @@ if __name__ == "__main__":
     # Generate some mock data for testing
     from app import JobScraper
     basic_scraper = JobScraper()
-    jobs = basic_scraper.generate_mock_jobs(20)
+    jobs = list(basic_scraper.generate_mock_jobs(20))
     
     # Save to different formats
     scraper.save_to_csv(jobs, 'sample_jobs.csv')